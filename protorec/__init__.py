@@ -6,24 +6,64 @@ recording video streams, and serving a web interface for control.
 
 from __future__ import annotations
 
-import datetime
 import json
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional, Union
+import weakref
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple, Type, Union
 
 import cv2  # type: ignore
 import numpy as np
-from flask import Flask, Response, jsonify, render_template
+from flask import Flask, Response, render_template
+
+from protorec.pipelines.pipeline_abc import BasePipeline
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from protorec.pipelines import RGBPipeline, ThermalPipeline
 
 __version__ = "0.2.0"
 
+_PIPELINE_TYPES: Dict[str, Type[BasePipeline]] = {
+    "color": RGBPipeline,
+    "thermal": ThermalPipeline,
+}
+
+_GB = 1 << 30
+_DISK_USAGE_TTL = 2.0
+_disk_usage_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+
+
+def _json_response(payload: Any) -> Response:
+    """Serialize a payload to a JSON response, using orjson when available.
+
+    Parameters
+    ----------
+    payload : Any
+        JSON-serializable object
+
+    Returns
+    -------
+    Response
+        Flask response with application/json content
+    """
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload).encode()
+    return Response(body, mimetype="application/json")
+
 
 def get_disk_usage(path: str = "/") -> Dict[str, float]:
     """Get disk usage statistics for the specified path.
 
+    Results are cached for a couple of seconds so that frequently polled
+    endpoints do not issue a statvfs syscall per request.
+
     Parameters
     ----------
     path : str, optional
@@ -38,14 +78,21 @@ def get_disk_usage(path: str = "/") -> Dict[str, float]:
         - 'used': Used disk space in GB
         - 'percent_used': Percentage of disk space used
     """
+    now = time.monotonic()
+    cached = _disk_usage_cache.get(path)
+    if cached is not None and now - cached[0] < _DISK_USAGE_TTL:
+        return cached[1]
+
     stat = os.statvfs(path)
 
-    total = (stat.f_blocks * stat.f_frsize) / (1024**3)  # Convert to GB
-    free = (stat.f_bfree * stat.f_frsize) / (1024**3)  # Convert to GB
+    total = (stat.f_blocks * stat.f_frsize) / _GB  # Convert to GB
+    free = (stat.f_bfree * stat.f_frsize) / _GB  # Convert to GB
     used = total - free
     percent_used = (used / total) * 100
 
-    return {"total": total, "free": free, "used": used, "percent_used": percent_used}
+    usage = {"total": total, "free": free, "used": used, "percent_used": percent_used}
+    _disk_usage_cache[path] = (now, usage)
+    return usage
 
 
 class CameraManager:
@@ -67,18 +114,43 @@ class CameraManager:
         """
         self.is_recording: bool = False
         self.recdir: str = recdir
-        self.cameras_config: Dict[str, Any] = json.load(open(config_path, "r"))
-        self.camera_names: List[str] = [
-            self.cameras_config["cameras"][i]["name"]
-            for i in range(len(self.cameras_config["cameras"]))
-        ]
+        with open(config_path, "rb") as f:
+            raw_config = f.read()
+        self.cameras_config: Dict[str, Any] = (
+            orjson.loads(raw_config) if orjson is not None else json.loads(raw_config)
+        )
+        self.camera_names: FrozenSet[str] = frozenset(
+            camera["name"] for camera in self.cameras_config["cameras"]
+        )
+        self.stream_size: Tuple[int, int] = (
+            self.cameras_config.get("stream_width", 1280),
+            self.cameras_config.get("stream_height", 720),
+        )
         self.cameras: Dict[str, Union[RGBPipeline, ThermalPipeline]] = (
             self._initialize_cameras()
         )
         self.streaming_camera: Optional[str] = self._validate_streaming_camera(
             self.cameras_config["streaming_camera"]
         )
-        self.recording_start_time: Optional[datetime.datetime] = None
+        try:
+            self._use_cuda: bool = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            self._use_cuda = False
+        self._gpu_mat = cv2.cuda_GpuMat() if self._use_cuda else None
+        self.recording_start_time: Optional[float] = None
+        width, height = self.stream_size
+        self._blank_frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._blank_frame.flags.writeable = False
+        self._blank_jpeg: bytes = cv2.imencode(".jpg", self._blank_frame)[1].tobytes()
+        self._jpeg_bufs = [bytearray(512 * 1024) for _ in range(3)]
+        self._jpeg_lens = [0, 0, 0]
+        self._write_idx = 0
+        self._read_idx = 1
+        self._swap_lock = threading.Lock()
+        self._client_events: "weakref.WeakSet[threading.Event]" = weakref.WeakSet()
+        self.state_changed = threading.Condition()
+        self._stream_thread = threading.Thread(target=self._stream_worker, daemon=True)
+        self._stream_thread.start()
 
     def _validate_streaming_camera(
         self, streaming_camera: Optional[str]
@@ -104,7 +176,7 @@ class CameraManager:
             return None
         elif streaming_camera not in self.camera_names:
             raise ValueError(
-                f"Unknown camera name: {streaming_camera}, should be one of {self.camera_names}"
+                f"Unknown camera name: {streaming_camera}, should be one of {sorted(self.camera_names)}"
             )
         elif self.cameras[streaming_camera].config["type"] != "color":
             raise ValueError(
@@ -127,15 +199,18 @@ class CameraManager:
             If unknown camera type specified in config
         """
         cameras = {}
+        width, height = self.stream_size
         for camera_config in self.cameras_config["cameras"]:
-            if camera_config["type"] == "color":
-                cameras[camera_config["name"]] = RGBPipeline(camera_config)
-            elif camera_config["type"] == "thermal":
-                cameras[camera_config["name"]] = ThermalPipeline(camera_config)
-            else:
+            pipeline_cls = _PIPELINE_TYPES.get(camera_config["type"])
+            if pipeline_cls is None:
                 raise ValueError(
-                    f"Unknown camera type: {camera_config['type']}, should be either 'color' or 'thermal'"
+                    f"Unknown camera type: {camera_config['type']}, should be one of {sorted(_PIPELINE_TYPES)}"
                 )
+            # Pass the top-level stream size down so the pipelines size
+            # their preview branches to match.
+            camera_config.setdefault("stream_width", width)
+            camera_config.setdefault("stream_height", height)
+            cameras[camera_config["name"]] = pipeline_cls(camera_config)
         return cameras
 
     def start_recording(self) -> Dict[str, str]:
@@ -150,22 +225,21 @@ class CameraManager:
             return {"status": "already recording"}
 
         self.is_recording = True
-        self.recording_start_time = datetime.datetime.now()
+        self.recording_start_time = time.monotonic()
         folder = time.strftime("%Y-%m-%d-%H-%M-%S")
         directory = os.path.join(self.recdir, folder)
         os.makedirs(directory, exist_ok=True)
 
-        for camera_pipeline in self.cameras.values():
+        camera_pipelines = list(self.cameras.values())
+        for camera_pipeline in camera_pipelines:
             camera_pipeline.set_dir(directory)
-
-        for camera_pipeline in self.cameras.values():
             camera_pipeline.run()
 
-        while not all(
-            camera_pipeline.is_playing() for camera_pipeline in self.cameras.values()
-        ):
-            pass
+        for camera_pipeline in camera_pipelines:
+            camera_pipeline.wait_until_playing()
 
+        with self.state_changed:
+            self.state_changed.notify_all()
         return {"status": "recording started"}
 
     def stop_recording(self) -> Dict[str, str]:
@@ -182,13 +256,13 @@ class CameraManager:
         for camera_pipeline in self.cameras.values():
             camera_pipeline.stop()
 
-        while not all(
-            camera_pipeline.is_stopped() for camera_pipeline in self.cameras.values()
-        ):
-            pass
+        for camera_pipeline in self.cameras.values():
+            camera_pipeline.wait_until_stopped()
 
         self.is_recording = False
         self.recording_start_time = None
+        with self.state_changed:
+            self.state_changed.notify_all()
         return {"status": "recording stopped"}
 
     def get_state(self) -> Dict[str, Any]:
@@ -202,10 +276,8 @@ class CameraManager:
             - 'recording_duration': float of elapsed seconds if recording, else None
         """
         elapsed_time = None
-        if self.is_recording and self.recording_start_time:
-            elapsed_time = (
-                datetime.datetime.now() - self.recording_start_time
-            ).total_seconds()
+        if self.is_recording and self.recording_start_time is not None:
+            elapsed_time = time.monotonic() - self.recording_start_time
 
         return {
             "is_recording": self.is_recording,
@@ -218,18 +290,192 @@ class CameraManager:
         Returns
         -------
         np.ndarray
-            Current video frame as numpy array with shape (720, 1280, 3)
+            Current video frame as numpy array at the configured stream size
         """
+        width, height = self.stream_size
         if self.streaming_camera is None:
-            return np.zeros((720, 1280, 3), dtype=np.uint8)
+            return self._blank_frame
 
         frame = self.cameras[self.streaming_camera].get_frame()
         if frame is None:
-            return np.zeros((720, 1280, 3), dtype=np.uint8)
+            return self._blank_frame
 
-        frame = cv2.resize(frame, (1280, 720))
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = self._resize(frame)
         return frame
 
+    def _resize(self, frame: np.ndarray) -> np.ndarray:
+        """Resize a frame to the configured stream size.
+
+        Uses CUDA when a GPU is available and the capture is at least
+        1080p, so the host/device transfers are amortized; otherwise falls
+        back to a CPU nearest-neighbour resize.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            Frame to resize
+
+        Returns
+        -------
+        np.ndarray
+            Frame resized to the configured stream size
+        """
+        if self._use_cuda and frame.shape[0] >= 1080:
+            self._gpu_mat.upload(frame)
+            gpu_resized = cv2.cuda.resize(
+                self._gpu_mat, self.stream_size, interpolation=cv2.INTER_LINEAR
+            )
+            return gpu_resized.download()
+        return cv2.resize(frame, self.stream_size, interpolation=cv2.INTER_NEAREST)
+
+    def get_jpeg(self) -> bytes:
+        """Get the current frame from the streaming camera as JPEG bytes.
+
+        Uses the hardware-encoded JPEG from the streaming pipeline when
+        available, falling back to a CPU encode of the raw frame otherwise.
+
+        Returns
+        -------
+        bytes
+            JPEG-encoded frame at the configured stream size
+        """
+        if self.streaming_camera is None:
+            return self._blank_jpeg
+
+        jpeg = self.cameras[self.streaming_camera].get_jpeg()
+        if jpeg is not None:
+            return jpeg
+
+        frame = self.get_frame()
+        if frame is self._blank_frame:
+            return self._blank_jpeg
+
+        _, buffer = cv2.imencode(".jpg", frame)
+        return bytes(buffer)
+
+    def register(self, event: threading.Event) -> None:
+        """Register a per-client event signalled when a new JPEG is ready.
+
+        Parameters
+        ----------
+        event : threading.Event
+            Event to set whenever the latest JPEG is updated. Held via a
+            weak reference, so it is dropped when the client disconnects.
+        """
+        self._client_events.add(event)
+
+    def get_latest_jpeg(self) -> bytes:
+        """Get the most recently produced JPEG frame.
+
+        Returns
+        -------
+        bytes
+            Copy of the latest complete JPEG frame, or empty bytes if the
+            producer has not published a frame yet
+        """
+        with self._swap_lock:
+            idx = self._read_idx
+            return bytes(memoryview(self._jpeg_bufs[idx])[: self._jpeg_lens[idx]])
+
+    def _stream_worker(self) -> None:
+        """Produce JPEG frames for all streaming clients.
+
+        A single daemon thread writes each encoded JPEG into one of three
+        preallocated buffers and publishes it with an index swap under a
+        short-lived lock, so readers always see a complete frame and the
+        producer never allocates on the hot path. Every registered client
+        is woken per frame; slow clients simply skip frames.
+        """
+        interval = 1.0 / 30
+        while True:
+            jpeg = self.get_jpeg()
+            buf = self._jpeg_bufs[self._write_idx]
+            n = len(jpeg)
+            buf[:n] = jpeg
+            self._jpeg_lens[self._write_idx] = n
+            with self._swap_lock:
+                self._read_idx, self._write_idx = (
+                    self._write_idx,
+                    (self._write_idx + 1) % 3,
+                )
+            for event in list(self._client_events):
+                event.set()
+            time.sleep(interval)
+
+
+def _state_event_stream(camera_manager: CameraManager, recdir: str) -> Iterator[str]:
+    """Yield Server-Sent Events whenever the recording state changes.
+
+    Emits an event on the first iteration, on recording toggles, when the
+    free disk space moves by more than half a gigabyte, and once per second
+    while a recording is running so the duration counter keeps ticking.
+    Quiet periods emit an SSE comment as a heartbeat so idle connections
+    are not reaped by Waitress's channel_timeout, which would otherwise
+    leave EventSource in a permanent reconnect loop.
+
+    Parameters
+    ----------
+    camera_manager : CameraManager
+        Manager whose state is published
+    recdir : str
+        Recording directory to report disk usage for
+
+    Yields
+    ------
+    str
+        SSE-framed JSON state messages
+    """
+    last_recording = None
+    last_free = None
+    while True:
+        state = camera_manager.get_state()
+        disk_usage = get_disk_usage(recdir)
+        state["disk_usage"] = disk_usage
+        changed = (
+            last_recording is None
+            or state["is_recording"] != last_recording
+            or abs(disk_usage["free"] - last_free) > 0.5
+            or state["recording_duration"] is not None
+        )
+        if changed:
+            if orjson is not None:
+                data = orjson.dumps(state).decode()
+            else:
+                data = json.dumps(state)
+            yield f"data: {data}\n\n"
+            last_recording = state["is_recording"]
+            last_free = disk_usage["free"]
+        else:
+            yield ": keepalive\n\n"
+        with camera_manager.state_changed:
+            camera_manager.state_changed.wait(timeout=1.0)
+
+
+def _mjpeg_frame_stream(camera_manager: CameraManager) -> Iterator[bytes]:
+    """Yield multipart MJPEG parts as new frames are published.
+
+    Parameters
+    ----------
+    camera_manager : CameraManager
+        Manager producing the JPEG frames
+
+    Yields
+    ------
+    bytes
+        One multipart-framed JPEG per published frame
+    """
+    event = threading.Event()
+    camera_manager.register(event)
+    while True:
+        event.wait()
+        event.clear()
+        yield (
+            b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+            + camera_manager.get_latest_jpeg()
+            + b"\r\n"
+        )
+
 
 def create_app(config_path: str, recdir: str) -> Flask:
     """Create and configure the Flask application.
@@ -256,22 +502,36 @@ def create_app(config_path: str, recdir: str) -> Flask:
     @app.route("/get_state", methods=["GET"])
     def get_state() -> Response:
         state = camera_manager.get_state()
-        disk_usage = get_disk_usage(recdir)
-        state.update({"disk_usage": disk_usage})
-        return jsonify(state)
+        state["disk_usage"] = get_disk_usage(recdir)
+        response = _json_response(state)
+        response.headers["Cache-Control"] = "max-age=1"
+        return response
+
+    @app.route("/events")
+    def events() -> Response:
+        response = Response(
+            _state_event_stream(camera_manager, recdir),
+            mimetype="text/event-stream",
+        )
+        response.headers["Cache-Control"] = "no-store"
+        return response
 
     @app.route("/start_recording", methods=["POST"])
     def start_recording() -> Response:
-        return jsonify(camera_manager.start_recording())
+        return _json_response(camera_manager.start_recording())
 
     @app.route("/stop_recording", methods=["POST"])
     def stop_recording() -> Response:
-        return jsonify(camera_manager.stop_recording())
+        return _json_response(camera_manager.stop_recording())
 
     @app.route("/frame")
     def get_frame() -> Response:
-        frame = camera_manager.get_frame()
-        _, buffer = cv2.imencode(".jpg", frame)
-        return Response(buffer.tobytes(), mimetype="image/jpeg")
+        response = Response(
+            _mjpeg_frame_stream(camera_manager),
+            mimetype="multipart/x-mixed-replace; boundary=frame",
+        )
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["Pragma"] = "no-cache"
+        return response
 
     return app
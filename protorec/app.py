@@ -31,14 +31,27 @@ Gst.init(sys.argv)
 
 
 def run() -> NoReturn:
-    """Run the protorec web server.
+    r"""Run the protorec web server.
 
     This function parses command line arguments, sets up the recording directory,
     initializes the Flask application, and starts the web server.
 
+    The server is a single Waitress process with an explicit thread pool so
+    that long-lived MJPEG stream responses do not head-of-line block the
+    control endpoints. Each open browser tab holds two threads for the whole
+    session (/frame and /events), so size the pool to at least
+    2 x expected viewers plus a few spare threads for the control endpoints.
+    An equivalent gunicorn invocation is::
+
+        gunicorn -w 1 -k gthread --threads 16 -b 0.0.0.0:5000 \\
+            'protorec:create_app("<config>", "<recdir>")'
+
+    Keep a single worker: CameraManager state lives in-process.
+
     Command line arguments:
         --recdir: Path to recording directory (default: ~/POWER_Data/SDCard/DataSink/prototype_recordings)
         --config: Path to camera configuration file (default: ~/cameras_config.json)
+        --threads: Size of the Waitress thread pool (default: 16)
     """
     parser = argparse.ArgumentParser(description="Run the protorec web server")
     parser.add_argument(
@@ -55,10 +68,25 @@ def run() -> NoReturn:
         default=(Path.home() / "cameras_config.json").as_posix(),
         help="Path to camera configuration file",
     )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=16,
+        help="Size of the Waitress thread pool (2 x viewers + controls)",
+    )
     args = parser.parse_args()
 
     if not os.path.exists(args.recdir):
         os.makedirs(args.recdir)
 
     app = create_app(args.config, args.recdir)
-    serve(app, host="0.0.0.0", port=5000)
+    serve(
+        app,
+        host="0.0.0.0",
+        port=5000,
+        threads=args.threads,
+        connection_limit=256,
+        cleanup_interval=5,
+        outbuf_overflow=1048576,
+        channel_timeout=30,
+    )
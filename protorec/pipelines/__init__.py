@@ -13,7 +13,7 @@ try:
 
     gi.require_version("Gst", "1.0")
     gi.require_version("GstApp", "1.0")
-    from gi.repository import Gst
+    from gi.repository import GLib, Gst
 
     from .rgb_pipeline import RGBPipeline
     from .thermal_pipeline import ThermalPipeline
@@ -29,4 +29,4 @@ except ImportError:
         """Dummy thermal pipeline implementation."""
 
 
-__all__ = ["Gst", "RGBPipeline", "ThermalPipeline"]
+__all__ = ["GLib", "Gst", "RGBPipeline", "ThermalPipeline"]
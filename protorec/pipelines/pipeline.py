@@ -5,11 +5,31 @@ setup and control for video recording from different camera types.
 """
 
 import os
+import threading
 from typing import Any, Dict, Optional
 
-from . import Gst
+from . import GLib, Gst
 from .pipeline_abc import BasePipeline
 
+_main_loop: Optional["GLib.MainLoop"] = None
+_main_loop_lock = threading.Lock()
+
+
+def _ensure_main_loop() -> None:
+    """Start the shared GLib main loop servicing all pipeline buses.
+
+    Every pipeline attaches its bus watch to the default main context, so
+    one background thread dispatches bus messages for all cameras instead
+    of each pipeline needing its own loop.
+    """
+    global _main_loop
+    with _main_loop_lock:
+        if _main_loop is None:
+            _main_loop = GLib.MainLoop()
+            threading.Thread(
+                target=_main_loop.run, daemon=True, name="gst-bus-loop"
+            ).start()
+
 
 class CameraPipeline(BasePipeline):
     """Base class for camera pipeline handling.
@@ -40,6 +60,31 @@ class CameraPipeline(BasePipeline):
         self.terminate = False
         self.dir = "."
         self.format = config["format"]
+        self._sink_location = os.path.join(self.dir, config["name"] + self.format)
+        self._playing_event = threading.Event()
+        self._stopped_event = threading.Event()
+        _ensure_main_loop()
+        self.bus: Gst.Bus = self.pipeline.get_bus()
+        self.bus.add_signal_watch()
+        self.bus.connect("message::state-changed", self._on_state_changed)
+
+    def _on_state_changed(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """Track pipeline state changes reported on the bus.
+
+        Parameters
+        ----------
+        bus : Gst.Bus
+            Bus the message was posted on
+        message : Gst.Message
+            State-changed message
+        """
+        if message.src is not self.pipeline:
+            return
+        _, new_state, _ = message.parse_state_changed()
+        if new_state == Gst.State.PLAYING:
+            self._playing_event.set()
+        elif new_state == Gst.State.NULL:
+            self._stopped_event.set()
 
     def construct_pipeline(self) -> Gst.Pipeline:
         """Construct the GStreamer pipeline.
@@ -59,50 +104,86 @@ class CameraPipeline(BasePipeline):
         """
         raise NotImplementedError("Subclasses must implement construct_pipeline()")
 
-    def get_src(self) -> Gst.Element:
-        """Get source element and apply properties.
+    @staticmethod
+    def _parse_launch(description: str) -> Gst.Pipeline:
+        """Parse a launch description, failing fast with a clear error.
 
-        Returns
-        -------
-        Gst.Element
-            Configured source element
-        """
-        src = Gst.ElementFactory.make(self.config["element"], "src")
-        if src is None:
-            raise RuntimeError(f"Could not create {self.config['element']} element")
-
-        for key, value in self.config["properties"].items():
-            src.set_property(key, value)
-        return src
-
-    def get_sink(self) -> Gst.Element:
-        """Get sink element.
+        Parameters
+        ----------
+        description : str
+            gst-launch style pipeline description
 
         Returns
         -------
-        Gst.Element
-            Configured filesink element
+        Gst.Pipeline
+            Parsed pipeline
+
+        Raises
+        ------
+        RuntimeError
+            If the description cannot be parsed, e.g. because a plugin
+            is missing
         """
-        sink = Gst.ElementFactory.make("filesink", "filesink")
-        if sink is None:
-            raise RuntimeError("Could not create filesink element")
-        return sink
+        try:
+            return Gst.parse_launch(description)
+        except GLib.Error as error:
+            raise RuntimeError(
+                f"Failed to construct pipeline: {error.message}\n{description}"
+            ) from error
 
     def run(self) -> None:
         """Run the pipeline and set the sink location."""
         if self.sink is None:
             raise RuntimeError("Pipeline sink not initialized")
 
-        self.sink.set_property(
-            "location", os.path.join(self.dir, self.config["name"] + self.format)
-        )
+        self.sink.set_property("location", self._sink_location)
+        self._playing_event.clear()
         self.pipeline.set_state(Gst.State.READY)
         self.pipeline.set_state(Gst.State.PLAYING)
 
     def stop(self) -> None:
         """Stop the pipeline and set state to NULL."""
+        self._stopped_event.clear()
         self.pipeline.send_event(Gst.Event.new_eos())
-        self.pipeline.set_state(Gst.State.NULL)
+        ret = self.pipeline.set_state(Gst.State.NULL)
+        if ret == Gst.StateChangeReturn.SUCCESS:
+            # The transition to NULL is synchronous and is not reported on
+            # the bus, so flag it directly.
+            self._stopped_event.set()
+
+    def wait_until_playing(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until the pipeline reaches the PLAYING state.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum seconds to wait for the bus notification, by default 5.0
+
+        Returns
+        -------
+        bool
+            True if the pipeline is playing
+        """
+        if self._playing_event.wait(timeout):
+            return True
+        return self.is_playing()
+
+    def wait_until_stopped(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until the pipeline reaches the NULL state.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum seconds to wait for the bus notification, by default 5.0
+
+        Returns
+        -------
+        bool
+            True if the pipeline is stopped
+        """
+        if self._stopped_event.wait(timeout):
+            return True
+        return self.is_stopped()
 
     def is_playing(self) -> bool:
         """Check if the pipeline is playing.
@@ -135,3 +216,4 @@ class CameraPipeline(BasePipeline):
             Path to directory where videos will be saved
         """
         self.dir = dir_path
+        self._sink_location = os.path.join(dir_path, self.config["name"] + self.format)
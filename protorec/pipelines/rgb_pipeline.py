@@ -4,12 +4,13 @@ This module provides the RGBPipeline class that implements a GStreamer pipeline
 for recording from RGB/color cameras with NVIDIA hardware acceleration.
 """
 
-from copy import deepcopy
-from typing import Any, Dict, Optional
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
-from protorec.pipelines import Gst
+from protorec.pipelines import Gst, logger
 from protorec.pipelines.pipeline import CameraPipeline
 
 
@@ -31,186 +32,120 @@ class RGBPipeline(CameraPipeline):
         framerate : int, optional
             Video framerate, by default 30
         """
-        super().__init__(config, framerate)
         self._frame: Optional[np.ndarray] = None
+        self._frame_shape: Optional[Tuple[int, int, int]] = None
+        self._ring: List[np.ndarray] = []
+        self._ring_idx: int = 0
+        self._jpeg: Optional[bytes] = None
+        self._appsink_thread: Optional[threading.Thread] = None
         self.tee: Optional[Gst.Element] = None
-        self.queue_recording: Optional[Gst.Element] = None
         self.appsink: Optional[Gst.Element] = None
+        self.jpegsink: Optional[Gst.Element] = None
+        # Defaults must be set before super().__init__ because the base class
+        # calls construct_pipeline(), which assigns the real elements.
+        super().__init__(config, framerate)
 
-    def _create_elements(self) -> Dict[str, Optional[Gst.Element]]:
-        """Create all GStreamer elements for the pipeline."""
-        elements: Dict[str, Optional[Gst.Element]] = {}
+    def _launch_description(self) -> str:
+        """Build the gst-launch style description for the pipeline.
 
-        # Common elements
-        elements["videorate"] = Gst.ElementFactory.make("videorate", "videorate")
-        elements["capsfilter"] = Gst.ElementFactory.make("capsfilter", "capsfilter")
-        caps = Gst.Caps.from_string(
-            f"video/x-raw(memory:NVMM),framerate={self.framerate}/1"
-        )
-        if elements["capsfilter"] is not None:
-            elements["capsfilter"].set_property("caps", caps)
-
-        # Recording elements
-        elements["videoconvert"] = Gst.ElementFactory.make("nvvidconv", "nvvidconv")
-        elements["jpegenc"] = Gst.ElementFactory.make("nvjpegenc", "nvjpegenc")
-        elements["avimux"] = Gst.ElementFactory.make("avimux", "avimux")
-
-        # Appsink elements
-        elements.update(self._create_appsink_elements())
-        return elements
-
-    def _create_appsink_elements(self) -> Dict[str, Optional[Gst.Element]]:
-        """Create elements specific to the appsink branch."""
-        elements: Dict[str, Optional[Gst.Element]] = {}
-        elements["queue_appsink"] = Gst.ElementFactory.make("queue", "queue_appsink")
-        if elements["queue_appsink"] is not None:
-            elements["queue_appsink"].set_property("max-size-buffers", 5)
-            elements["queue_appsink"].set_property("leaky", 2)
-
-        elements["nvidconv_appsink"] = Gst.ElementFactory.make(
-            "nvvidconv", "nvvidconv_appsink"
-        )
-        elements["videoconvert_appsink"] = Gst.ElementFactory.make(
-            "videoconvert", "videoconvert_appsink"
-        )
-        elements["videorate_appsink"] = Gst.ElementFactory.make(
-            "videorate", "videorate_appsink"
+        Returns
+        -------
+        str
+            Launch description with the recording, raw appsink and JPEG
+            preview branches hanging off one tee
+        """
+        bitrate = self.config.get("bitrate", 4000000)
+        preset_level = self.config.get("preset_level", 1)
+        stream_width = self.config.get("stream_width", 1280)
+        stream_height = self.config.get("stream_height", 720)
+        # Unsynchronized by default: buffers are processed as fast as they
+        # arrive instead of waiting for clock alignment, which reduces
+        # leaky-queue drops under scheduling jitter. Set appsink_sync in
+        # the camera config to restore clocked delivery.
+        appsink_sync = "true" if self.config.get("appsink_sync", False) else "false"
+        # videorate duplicates or drops frames to hit the requested rate;
+        # when the source already delivers at the target framerate it is
+        # pure overhead, so it is only inserted when the rates differ.
+        videorate = (
+            ""
+            if self.config.get("source_framerate") == self.framerate
+            else "videorate ! "
         )
-        elements["capsfilter_appsink"] = Gst.ElementFactory.make(
-            "capsfilter", "capsfilter_appsink"
+        return (
+            f"{self.config['element']} name=src ! "
+            f"{videorate}video/x-raw(memory:NVMM),framerate={self.framerate}/1 ! "
+            "nvvidconv ! tee name=tee "
+            "tee. ! queue max-size-buffers=5 leaky=downstream ! "
+            f"nvv4l2h264enc preset-level={preset_level} insert-sps-pps=1 "
+            f"bitrate={bitrate} idrinterval={self.framerate * 2} ! "
+            "h264parse ! matroskamux ! filesink name=filesink "
+            "tee. ! queue max-size-buffers=1 leaky=downstream ! "
+            "nvvidconv ! video/x-raw,format=RGBA ! "
+            f"appsink name=appsink emit-signals=false sync={appsink_sync} "
+            "async=false max-buffers=1 drop=true enable-last-sample=false "
+            "tee. ! queue max-size-buffers=1 leaky=downstream ! "
+            "nvvidconv ! "
+            f"video/x-raw(memory:NVMM),width={stream_width},height={stream_height} ! "
+            "nvjpegenc ! appsink name=jpegsink emit-signals=false sync=false "
+            "max-buffers=1 drop=true enable-last-sample=false"
         )
 
-        caps_appsink = Gst.Caps.from_string("video/x-raw,format=BGR")
-        if elements["capsfilter_appsink"] is not None:
-            elements["capsfilter_appsink"].set_property("caps", caps_appsink)
-        return elements
-
     def construct_pipeline(self) -> Gst.Pipeline:
-        """Construct the GStreamer pipeline."""
-        pipeline = Gst.Pipeline.new("pipeline" + self.config["name"])
-        self.src = self.get_src()
-        self.sink = self.get_sink()
-
-        # Create elements
-        elements = self._create_elements()
-
-        # Create tee elements
-        self.tee = Gst.ElementFactory.make("tee", "tee")
-        self.queue_recording = Gst.ElementFactory.make("queue", "queue_recording")
-        if self.queue_recording is not None:
-            self.queue_recording.set_property("max-size-buffers", 5)
-            self.queue_recording.set_property("leaky", 2)
-
-        self.appsink = Gst.ElementFactory.make("appsink", "appsink")
-        if self.appsink is not None:
-            self.appsink.set_property("emit-signals", True)
-            self.appsink.set_property("sync", True)
-            self.appsink.set_property("max-buffers", 1)
-            self.appsink.set_property("drop", True)
-
-        # Check and add elements
-        failed_elements = [
-            name for name, element in elements.items() if element is None
-        ]
-        if failed_elements:
-            raise RuntimeError(
-                f"Failed to create elements: {', '.join(failed_elements)}"
-            )
-
-        for element in [
-            self.src,
-            *elements.values(),
-            self.tee,
-            self.queue_recording,
-            self.sink,
-            self.appsink,
-        ]:
-            if element is not None:
-                pipeline.add(element)
-
-        # Link elements
-        self._link_pipeline_elements(elements)
-        return pipeline
+        """Construct the GStreamer pipeline.
 
-    def _link_pipeline_elements(
-        self, elements: Dict[str, Optional[Gst.Element]]
-    ) -> None:
-        """Link all pipeline elements together."""
-        # Link main elements
-        if all(
-            x is not None
-            for x in [
-                self.src,
-                elements["videorate"],
-                elements["capsfilter"],
-                elements["videoconvert"],
-                self.tee,
-            ]
-        ):
-            self.src.link(elements["videorate"])
-            elements["videorate"].link(elements["capsfilter"])
-            elements["capsfilter"].link(elements["videoconvert"])
-            elements["videoconvert"].link(self.tee)
-
-        # Link recording branch
-        if all(
-            x is not None
-            for x in [
-                self.tee,
-                self.queue_recording,
-                elements["jpegenc"],
-                elements["avimux"],
-                self.sink,
-            ]
-        ):
-            self.tee.link(self.queue_recording)
-            self.queue_recording.link(elements["jpegenc"])
-            elements["jpegenc"].link(elements["avimux"])
-            elements["avimux"].link(self.sink)
-
-        # Link appsink branch
-        if all(
-            x is not None
-            for x in [
-                elements["queue_appsink"],
-                elements["nvidconv_appsink"],
-                elements["videoconvert_appsink"],
-                elements["capsfilter_appsink"],
-                self.appsink,
-            ]
-        ):
-            self.tee.link(elements["queue_appsink"])
-            elements["queue_appsink"].link(elements["nvidconv_appsink"])
-            elements["nvidconv_appsink"].link(elements["videoconvert_appsink"])
-            elements["videoconvert_appsink"].link(elements["capsfilter_appsink"])
-            elements["capsfilter_appsink"].link(self.appsink)
-            self.appsink.connect("new-sample", self.callback)
-
-    def callback(self, sink: Gst.Element) -> Gst.FlowReturn:
-        """Process new frames from the pipeline.
-
-        Parameters
-        ----------
-        sink : Gst.Element
-            Appsink element that emitted the new-sample signal
-
-        Returns
-        -------
-        Gst.FlowReturn
-            GST_FLOW_OK if frame was processed successfully
+        The whole graph is built with a single Gst.parse_launch call
+        instead of per-element factory, add and link calls, and the
+        elements the class interacts with are fetched back by name.
         """
-        sample = sink.emit("pull-sample")
-        if not sample:
-            return Gst.FlowReturn.ERROR
+        pipeline = self._parse_launch(self._launch_description())
+        pipeline.set_name("pipeline" + self.config["name"])
 
-        buffer = sample.get_buffer()
-        if not buffer:
-            return Gst.FlowReturn.ERROR
+        self.src = pipeline.get_by_name("src")
+        for key, value in self.config["properties"].items():
+            self.src.set_property(key, value)
 
-        new_frame = self.gst_to_numpy(sample)
-        self._frame = new_frame
+        self.sink = pipeline.get_by_name("filesink")
+        self.tee = pipeline.get_by_name("tee")
+        self.appsink = pipeline.get_by_name("appsink")
+        self.jpegsink = pipeline.get_by_name("jpegsink")
+        return pipeline
 
-        return Gst.FlowReturn.OK
+    def run(self) -> None:
+        """Run the pipeline and start the appsink polling thread."""
+        super().run()
+        self.terminate = False
+        self._appsink_thread = threading.Thread(target=self._pull_samples, daemon=True)
+        self._appsink_thread.start()
+
+    def _pull_samples(self) -> None:
+        """Pull samples from the appsink until the pipeline is stopped.
+
+        Polling with try_pull_sample avoids the per-frame GObject signal
+        emission and marshalling of the new-sample callback path. When the
+        camera config lists CPU cores under appsink_affinity, the thread
+        pins itself to them so the per-frame memcpy stays on a
+        high-performance core.
+        """
+        affinity = self.config.get("appsink_affinity")
+        if affinity:
+            try:
+                os.sched_setaffinity(0, set(affinity))
+            except (AttributeError, OSError):
+                logger.warning("Could not pin appsink thread to cores %s", affinity)
+        while not self.terminate:
+            sample = self.appsink.try_pull_sample(100 * Gst.MSECOND)
+            if sample is None:
+                continue
+            try:
+                new_frame = self.gst_to_numpy(sample)
+            except Exception:
+                # A malformed sample (e.g. a row-padded buffer that does
+                # not match the cached frame shape) must not kill the
+                # polling thread; drop the sample and keep pulling.
+                logger.exception("Dropping appsink sample that failed to convert")
+                continue
+            if new_frame is not None:
+                self._frame = new_frame
 
     def get_frame(self) -> Optional[np.ndarray]:
         """Get the latest frame from the pipeline.
@@ -218,14 +153,48 @@ class RGBPipeline(CameraPipeline):
         Returns
         -------
         Optional[np.ndarray]
-            Latest frame as numpy array, or None if no frame is available
+            Latest frame as a BGR numpy view, or None if no frame is
+            available. The RGBA frame stored by the appsink is sliced to
+            BGR without copying.
         """
-        return self._frame
+        if self._frame is None:
+            return None
+        return self._frame[..., 2::-1]
+
+    def get_jpeg(self) -> Optional[bytes]:
+        """Get the latest hardware-encoded JPEG from the preview branch.
+
+        Returns
+        -------
+        Optional[bytes]
+            Latest JPEG-encoded frame, or None if no frame is available
+        """
+        if self.jpegsink is None:
+            return self._jpeg
+
+        sample = self.jpegsink.try_pull_sample(0)
+        if sample is None:
+            return self._jpeg
 
-    @staticmethod
-    def gst_to_numpy(sample: Gst.Sample) -> np.ndarray:
+        buffer = sample.get_buffer()
+        success, map_info = buffer.map(Gst.MapFlags.READ)
+        if not success:
+            return self._jpeg
+
+        try:
+            self._jpeg = bytes(map_info.data)
+        finally:
+            buffer.unmap(map_info)
+        return self._jpeg
+
+    def gst_to_numpy(self, sample: Gst.Sample) -> Optional[np.ndarray]:
         """Convert GStreamer sample to numpy array.
 
+        Maps the buffer read-only and copies the mapped memory once into
+        a slot of a small preallocated ring, so the per-frame hot path
+        allocates nothing. The frame shape is read from the caps on the
+        first sample, which also sizes the ring.
+
         Parameters
         ----------
         sample : Gst.Sample
@@ -233,28 +202,46 @@ class RGBPipeline(CameraPipeline):
 
         Returns
         -------
-        np.ndarray
-            Video frame as numpy array
+        Optional[np.ndarray]
+            Video frame as numpy array, or None if the buffer could not
+            be mapped. The returned array is reused after two more
+            frames have been produced.
         """
         buf = sample.get_buffer()
-        caps = sample.get_caps()
-        struct = caps.get_structure(0)
-
-        height = struct.get_value("height")
-        width = struct.get_value("width")
-
-        array = np.ndarray(
-            (height, width, 3),
-            buffer=buf.extract_dup(0, buf.get_size()),
-            dtype=np.uint8,
-        )
+        if self._frame_shape is None:
+            struct = sample.get_caps().get_structure(0)
+            self._frame_shape = (
+                struct.get_value("height"),
+                struct.get_value("width"),
+                4,
+            )
 
-        return deepcopy(array)
+        success, map_info = buf.map(Gst.MapFlags.READ)
+        if not success:
+            return None
+
+        try:
+            if not self._ring:
+                self._ring = [
+                    np.empty(self._frame_shape, dtype=np.uint8) for _ in range(3)
+                ]
+            frame = self._ring[self._ring_idx]
+            self._ring_idx = (self._ring_idx + 1) % len(self._ring)
+            array = np.frombuffer(map_info.data, dtype=np.uint8)
+            np.copyto(frame, array.reshape(self._frame_shape))
+            return frame
+        finally:
+            buf.unmap(map_info)
 
     def stop(self) -> None:
         """Stop the pipeline and clean up resources.
 
         Note: When using pylonsrc, the Jetson device may crash.
         """
+        self.terminate = True
+        if self._appsink_thread is not None:
+            self._appsink_thread.join()
+            self._appsink_thread = None
         super().stop()
         self._frame = None
+        self._jpeg = None
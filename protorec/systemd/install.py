@@ -3,6 +3,7 @@
 import argparse
 import getpass
 import os
+import subprocess
 import sys
 from pathlib import Path
 
@@ -30,26 +31,28 @@ def install_service() -> None:
     parser.add_argument(
         "--config",
         type=str,
-        default=(real_home / "cameras_config.json").as_posix(),
-        help="Path to camera configuration file",
+        default=None,
+        help="Path to camera configuration file (default: ~/cameras_config.json)",
     )
     parser.add_argument(
         "--recdir",
         type=str,
-        default=(
-            real_home / "POWER_Data" / "SDCard" / "DataSink" / "prototype_recordings"
-        ).as_posix(),
+        default=None,
         help="Path to recording directory",
     )
     args = parser.parse_args()
 
-    # Read service template
-    template_path = Path(__file__).parent / SERVICE_NAME
-    with open(template_path, "r") as f:
-        service_content = f.read()
+    # Compute defaults lazily so overridden paths skip the Path work
+    if args.config is None:
+        args.config = (real_home / "cameras_config.json").as_posix()
+    if args.recdir is None:
+        args.recdir = (
+            real_home / "POWER_Data" / "SDCard" / "DataSink" / "prototype_recordings"
+        ).as_posix()
 
-    # Format service file
-    service_content = service_content.format(
+    # Read and format service template
+    template_path = Path(__file__).parent / SERVICE_NAME
+    service_content = template_path.read_text().format(
         user=user,
         config_path=args.config,
         recdir=args.recdir,
@@ -57,17 +60,20 @@ def install_service() -> None:
 
     # Write service file
     service_path = Path("/etc/systemd/system") / SERVICE_NAME
-    with open(service_path, "w") as f:
-        f.write(service_content)
+    service_path.write_text(service_content)
     print(f"Service file written to {service_path}")
 
     # Set permissions
-    os.chmod(service_path, 0o644)
+    service_path.chmod(0o644)
 
     # Reload systemd and enable service
-    os.system("systemctl daemon-reload")
-    os.system(f"systemctl enable {SERVICE_NAME}")
-    os.system(f"systemctl restart {SERVICE_NAME}")
+    try:
+        subprocess.run(["systemctl", "daemon-reload"], check=True)
+        subprocess.run(["systemctl", "enable", SERVICE_NAME], check=True)
+        subprocess.run(["systemctl", "restart", SERVICE_NAME], check=True)
+    except subprocess.CalledProcessError as error:
+        print(f"systemctl command failed: {error}")
+        sys.exit(1)
     print(f"{SERVICE_NAME} has been installed, enabled and (re)started")
     print(f"To check status, run: sudo systemctl status {Path(SERVICE_NAME).stem}")
     print(f"To check logs, run: sudo journalctl -u {Path(SERVICE_NAME).stem} -f")